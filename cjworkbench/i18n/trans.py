@@ -1,11 +1,12 @@
 from datetime import datetime
+import functools
+from html.parser import HTMLParser
 import importlib.resources
 import logging
 from io import BytesIO
 import threading
-from typing import Dict, Union, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 from weakref import WeakKeyDictionary
-from bs4 import BeautifulSoup
 from django.utils.functional import lazy
 from django.utils.html import escape
 from django.utils.translation import get_language
@@ -17,7 +18,7 @@ import cjwparse.i18n
 from cjwstate.modules.types import ModuleZipfile
 from cjworkbench.i18n import default_locale, supported_locales
 from cjworkbench.i18n.catalogs import catalog_path
-from cjworkbench.i18n.catalogs.util import find_string, read_po_catalog
+from cjworkbench.i18n.catalogs.util import read_po_catalog
 
 _translators = {}
 
@@ -39,7 +40,9 @@ _TagMapping = Dict[str, _Tag]
 _MessageArguments = Dict[str, Union[int, float, str, datetime]]
 
 
-def trans(message_id: str, *, default: str, arguments: _MessageArguments = {}) -> str:
+def trans(
+    message_id: str, *, default: str, arguments: Optional[_MessageArguments] = None
+) -> str:
     """Mark a message for translation and localize it to the current locale.
 
     `default` is only considered when parsing code for message extraction.
@@ -58,7 +61,9 @@ trans_lazy = lazy(trans)
 """
 
 
-def localize(locale_id: str, message_id: str, arguments: _MessageArguments = {}) -> str:
+def localize(
+    locale_id: str, message_id: str, arguments: Optional[_MessageArguments] = None
+) -> str:
     """Localize the given message ID to the given locale.
 
     Raise `KeyError` if the message is not found (neither in the catalogs of the given and of the default locale).
@@ -73,8 +78,8 @@ def localize_html(
     locale_id: str,
     message_id: str,
     context: Optional[str] = None,
-    arguments: _MessageArguments = {},
-    tags: _TagMapping = {},
+    arguments: Optional[_MessageArguments] = None,
+    tags: Optional[_TagMapping] = None,
 ) -> str:
     """Localize the given message ID to the given locale, escaping HTML.
 
@@ -92,9 +97,32 @@ class NotInternationalizedError(Exception):
     pass
 
 
+_CatalogIndex = Dict[Tuple[str, Optional[str]], str]
+""" Maps (message_id, context) to the (non-empty) message string
+"""
+
+
+def _index_catalog(catalog: Catalog) -> _CatalogIndex:
+    """Return a plain-dict index of the translated messages in `catalog`."""
+    index = {}
+    for message in catalog:
+        if message.id and message.string:
+            # Babel keys gettext-plural messages by their singular ID
+            message_id = (
+                message.id[0] if isinstance(message.id, (list, tuple)) else message.id
+            )
+            index[(message_id, message.context)] = message.string
+    return index
+
+
 class MessageLocalizer:
     def __init__(self, catalogs: Dict[str, Catalog]):
-        self.catalogs = catalogs
+        # Keep only the indexes: the Babel catalogs are much bigger, and
+        # every cached module zipfile has a localizer.
+        self._indexes: Dict[str, _CatalogIndex] = {
+            locale_id: _index_catalog(catalog)
+            for locale_id, catalog in catalogs.items()
+        }
 
     def find_message(
         self, locale_id: str, message_id: str, context: Optional[str] = None
@@ -103,28 +131,36 @@ class MessageLocalizer:
 
         Raise `KeyError` if the locale has no catalog or the catalog has no such message.
         """
-        message = find_string(self.catalogs[locale_id], message_id, context=context)
-        if message:
-            return message
-        else:
+        message = self._find_message_or_none(locale_id, message_id, context)
+        if message is None:
             raise KeyError(message_id)
+        return message
+
+    def _find_message_or_none(
+        self, locale_id: str, message_id: str, context: Optional[str]
+    ) -> Optional[str]:
+        """Find the message with the given id in the given locale, or `None`."""
+        index = self._indexes.get(locale_id)
+        return None if index is None else index.get((message_id, context))
 
     def localize(
-        self, locale_id: str, message_id: str, arguments: _MessageArguments = {}
+        self,
+        locale_id: str,
+        message_id: str,
+        arguments: Optional[_MessageArguments] = None,
     ) -> str:
         if locale_id != default_locale:
-            try:
-                message = self.find_message(locale_id, message_id)
-                return icu_format_message(locale_id, message, arguments=arguments)
-            except ICUError as err:
-                logger.exception(
-                    "Error in po file for locale %s and message %s: %s",
-                    locale_id,
-                    message_id,
-                    err,
-                )
-            except KeyError:
-                pass
+            message = self._find_message_or_none(locale_id, message_id, None)
+            if message is not None:
+                try:
+                    return icu_format_message(locale_id, message, arguments=arguments)
+                except ICUError as err:
+                    logger.exception(
+                        "Error in po file for locale %s and message %s: %s",
+                        locale_id,
+                        message_id,
+                        err,
+                    )
         message = self.find_message(default_locale, message_id)
         return icu_format_message(default_locale, message, arguments=arguments)
 
@@ -134,24 +170,23 @@ class MessageLocalizer:
         message_id: str,
         *,
         context: Optional[str],
-        arguments: _MessageArguments,
-        tags: _TagMapping,
+        arguments: Optional[_MessageArguments],
+        tags: Optional[_TagMapping],
     ) -> str:
         if locale_id != default_locale:
-            try:
-                message = self.find_message(locale_id, message_id, context=context)
-                return icu_format_html_message(
-                    locale_id, message, arguments=arguments, tags=tags
-                )
-            except ICUError as err:
-                logger.exception(
-                    "Error in po file for locale %s and message %s: %s",
-                    locale_id,
-                    message_id,
-                    err,
-                )
-            except KeyError:
-                pass
+            message = self._find_message_or_none(locale_id, message_id, context)
+            if message is not None:
+                try:
+                    return icu_format_html_message(
+                        locale_id, message, arguments=arguments, tags=tags
+                    )
+                except ICUError as err:
+                    logger.exception(
+                        "Error in po file for locale %s and message %s: %s",
+                        locale_id,
+                        message_id,
+                        err,
+                    )
         message = self.find_message(default_locale, message_id, context=context)
         return icu_format_html_message(
             default_locale, message, arguments=arguments, tags=tags
@@ -177,19 +212,13 @@ class MessageLocalizerRegistry:
         try:
             result = self._cache[module_zipfile]
         except KeyError:
-            # 2. Lock, and try again. (This prevents a race.)
+            # 2. Parse po files without locking. Parsing is slow, and holding
+            # the lock would stall callers that want other modules' localizers.
+            created = self._create_localizer_for_module_zipfile(module_zipfile)
+            # 3. Lock, and publish. Race: if some other thread already
+            # published a value, use that one and discard ours.
             with self._cache_lock:
-                try:
-                    # Race: some other thread already calculated the value. Use
-                    # that one.
-                    result = self._cache[module_zipfile]
-                except KeyError:
-                    # 3. Update the cache, still holding the lock.
-                    result = self._create_localizer_for_module_zipfile(module_zipfile)
-                    self._cache[module_zipfile] = result
-
-                # Release the lock. If another caller is waiting for us to release
-                # the lock, now it should check self._cache again.
+                result = self._cache.setdefault(module_zipfile, created)
 
         if result is None:
             raise NotInternationalizedError
@@ -226,7 +255,7 @@ class MessageLocalizerRegistry:
         return MessageLocalizer(catalogs)
 
     def _create_localizer_for_module_zipfile(
-        cls, module_zipfile: ModuleZipfile
+        self, module_zipfile: ModuleZipfile
     ) -> Optional[MessageLocalizer]:
         catalogs = {}
         for locale_id in supported_locales:
@@ -242,9 +271,8 @@ class MessageLocalizerRegistry:
                     locale_id,
                     err,
                 )
-                pass
             except KeyError:
-                pass
+                pass  # module does not support this locale
         if not catalogs:
             return None
         return MessageLocalizer(catalogs)
@@ -253,6 +281,20 @@ class MessageLocalizerRegistry:
 MESSAGE_LOCALIZER_REGISTRY = MessageLocalizerRegistry()
 
 
+_FrozenTagMapping = Tuple[Tuple[str, str, Tuple[Tuple[str, str], ...]], ...]
+""" Hashable equivalent of a `_TagMapping`: (placeholder, tag, sorted attrs)
+"""
+
+
+def _freeze_tag_mapping(tag_mapping: _TagMapping) -> _FrozenTagMapping:
+    return tuple(
+        sorted(
+            (name, tag["tag"], tuple(sorted(tag.get("attrs", {}).items())))
+            for name, tag in tag_mapping.items()
+        )
+    )
+
+
 def restore_tags(message: str, tag_mapping: _TagMapping) -> str:
     """Replace the HTML tags and attributes in a message.
 
@@ -264,26 +306,197 @@ def restore_tags(message: str, tag_mapping: _TagMapping) -> str:
 
     Nested HTML tags are removed, with their (escaped) contents kept
 
-    Returns the new message
+    Returns the new message. Results are cached per (message, tag_mapping).
+    """
+    try:
+        frozen_tag_mapping = _freeze_tag_mapping(tag_mapping)
+        hash(frozen_tag_mapping)
+    except (KeyError, TypeError):
+        # We can't build a cache key (e.g., an attribute value is a list, or a
+        # placeholder has no "tag"). That's only an error if `message` uses the
+        # placeholder, so don't cache.
+        return _restore_tags(message, tag_mapping)
+    return _restore_tags_cached(message, frozen_tag_mapping)
+
+
+@functools.lru_cache(maxsize=4096)
+def _restore_tags_cached(message: str, frozen_tag_mapping: _FrozenTagMapping) -> str:
+    tag_mapping = {
+        name: {"tag": tag, "attrs": dict(attrs)}
+        for name, tag, attrs in frozen_tag_mapping
+    }
+    return _restore_tags(message, tag_mapping)
+
+
+def _restore_tags(message: str, tag_mapping: _TagMapping) -> str:
+    parser = _TagRestorer(tag_mapping)
+    parser.feed(message)
+    parser.close()
+    return "".join(parser.parts)
+
+
+_VOID_ELEMENTS = frozenset(
+    [
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "link",
+        "meta",
+        "param",
+        "source",
+        "track",
+        "wbr",
+    ]
+)
+
+
+def _escape_text(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _format_attribute(name: str, value: Any) -> str:
+    """Format ` name="value"`, the way BeautifulSoup did."""
+    if value is None:
+        return f" {name}"
+    if isinstance(value, (list, tuple)):
+        value = " ".join(value)  # e.g., "class": ["a", "b"]
+    value = _escape_text(str(value))
+    if '"' not in value:
+        return f' {name}="{value}"'
+    elif "'" not in value:
+        return f" {name}='{value}'"
+    else:
+        return ' {}="{}"'.format(name, value.replace('"', "&quot;"))
+
+
+class _TagRestorer(HTMLParser):
+    """Stream a message, rewriting its top-level tags into `parts`.
+
+    Only top-level tags are ever output, so there is no need to build a DOM:
+    we track the stack of open tags and collect the text within each top-level
+    one. Text is unescaped by the parser and re-escaped on output.
+
+    Top-level comments, declarations and processing instructions are output
+    as-is; nested ones are dropped.
+    """
+
+    def __init__(self, tag_mapping: _TagMapping):
+        super().__init__(convert_charrefs=True)
+        self.tag_mapping = tag_mapping
+        self.parts: List[str] = []
+        self._open_tags: List[str] = []
+        self._text: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_ELEMENTS:
+            self.handle_startendtag(tag, attrs)
+        else:
+            self._open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        if not self._open_tags:
+            self._flush(tag)  # a top-level tag with no text
+
+    def handle_endtag(self, tag):
+        if tag not in self._open_tags:
+            return  # unmatched end tag: ignore it
+        while self._open_tags.pop() != tag:
+            pass  # close tags left unclosed within this one
+        if not self._open_tags:
+            self._flush(tag)
+
+    def handle_data(self, data):
+        if self._open_tags:
+            self._text.append(data)
+        else:
+            self.parts.append(_escape_text(data))
+
+    def handle_comment(self, data):
+        if not self._open_tags:
+            self.parts.append(f"<!--{data}-->")
+
+    def handle_decl(self, decl):
+        if not self._open_tags:
+            self.parts.append(f"<!{decl}>")
+
+    def handle_pi(self, data):
+        if not self._open_tags:
+            self.parts.append(f"<?{data}>")
+
+    def unknown_decl(self, data):
+        if not self._open_tags:
+            self.parts.append(f"<![{data}]]>")
+        elif data.startswith("CDATA["):
+            self._text.append(data[len("CDATA[") :])
+
+    def close(self):
+        super().close()
+        if self._open_tags:
+            self._flush(self._open_tags[0])
+            self._open_tags.clear()
+
+    def _flush(self, tag: str) -> None:
+        """Output the top-level tag `tag`, which just closed, with its text."""
+        text = _escape_text("".join(self._text))
+        self._text.clear()
+        try:
+            mapping = self.tag_mapping[tag]
+        except KeyError:
+            self.parts.append(text)  # unknown tag: keep only its contents
+            return
+        new_tag = mapping["tag"]
+        attrs_html = "".join(
+            _format_attribute(name, value)
+            for name, value in sorted(mapping.get("attrs", {}).items())
+        )
+        self.parts.append(f"<{new_tag}{attrs_html}>{text}</{new_tag}>")
+
+
+@functools.lru_cache(maxsize=64)
+def _icu_locale(locale_id: str) -> Locale:
+    return Locale.createFromName(locale_id)
+
+
+@functools.lru_cache(maxsize=2048)
+def _icu_message_format(locale_id: str, message: str) -> MessageFormat:
+    """Parse `message` into a `MessageFormat`, caching the result.
+
+    Parsing dominates formatting for short messages, and the same messages are
+    formatted over and over. Raises `ICUError` (not cached) on invalid message.
     """
-    soup = BeautifulSoup(message, "html.parser")
-    bad = []
-    for child in soup.children:
-        if child.name:  # i.e. child is a tag
-            if child.name in tag_mapping:
-                child.attrs = tag_mapping[child.name].get("attrs", {})
-                child.name = tag_mapping[child.name]["tag"]
-                child.string = "".join(child.strings)
-            else:
-                bad.append(child)
-    for child in bad:
-        child.string = escape("".join(child.strings))
-        child.unwrap()
-    return str(soup)
+    return MessageFormat(message, _icu_locale(locale_id))
+
+
+def _is_icu_literal(message: str) -> bool:
+    """Return `True` if ICU would format `message` as-is.
+
+    Without a `{`, there are no arguments, plurals or selects; and ICU only
+    treats an apostrophe as a quote when it precedes `{`, `}` or another `'`.
+    """
+    return "{" not in message and "''" not in message and "'}" not in message
+
+
+def _to_formattable(value) -> Formattable:
+    """Wrap `value` for ICU, unless the caller already did."""
+    if isinstance(value, Formattable):
+        return value
+    return Formattable(value)
+
+
+def _to_html_formattable(value) -> Formattable:
+    """Wrap `value` for ICU, escaping it if it is a string."""
+    if isinstance(value, str):
+        return Formattable(escape(value))
+    return _to_formattable(value)
 
 
 def icu_format_message(
-    locale_id: str, message: str, arguments: _MessageArguments = {}
+    locale_id: str, message: str, arguments: Optional[_MessageArguments] = None
 ) -> str:
     """Substitute arguments into ICU-style message.
     You can have variable substitution, plurals, selects and nested messages.
@@ -292,16 +505,20 @@ def icu_format_message(
 
     The arguments must be a dict
     """
-    return MessageFormat(message, Locale.createFromName(locale_id)).format(
-        list(arguments.keys()), [Formattable(x) for x in arguments.values()]
+    if not arguments:
+        if _is_icu_literal(message):
+            return message
+        return _icu_message_format(locale_id, message).format((), ())
+    return _icu_message_format(locale_id, message).format(
+        tuple(arguments), tuple(map(_to_formattable, arguments.values()))
     )
 
 
 def icu_format_html_message(
     locale_id: str,
     message: str,
-    arguments: _MessageArguments = {},
-    tags: _TagMapping = {},
+    arguments: Optional[_MessageArguments] = None,
+    tags: Optional[_TagMapping] = None,
 ) -> str:
     """Substitute arguments into ICU-style HTML message.
     You can have variable substitution, plurals, selects and nested messages.
@@ -309,12 +526,11 @@ def icu_format_html_message(
 
     Raises `ICUError` in case of incorrectly formatted message.
     """
-    return MessageFormat(
-        restore_tags(message, tags), Locale.createFromName(locale_id)
-    ).format(
-        list(arguments.keys()),
-        [
-            Formattable(escape(x) if isinstance(x, str) else x)
-            for x in arguments.values()
-        ],
+    html = restore_tags(message, tags or {})
+    if not arguments:
+        if _is_icu_literal(html):
+            return html
+        return _icu_message_format(locale_id, html).format((), ())
+    return _icu_message_format(locale_id, html).format(
+        tuple(arguments), tuple(map(_to_html_formattable, arguments.values()))
     )
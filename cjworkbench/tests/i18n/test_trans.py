@@ -1,7 +1,7 @@
 import logging
 from babel.messages.catalog import Catalog
 from django.test import SimpleTestCase
-from icu import ICUError, InvalidArgsError
+from icu import Formattable, ICUError, InvalidArgsError
 from cjworkbench.i18n.trans import (
     localize,
     localize_html,
@@ -55,6 +55,39 @@ class ICUFormatMessageTest(SimpleTestCase):
         with self.assertRaises(ICUError):
             icu_format_message("en", "Hey {a b}!", arguments={"a": "you", "b": "!"})
 
+    # Tests that an invalid message is not cached as if it were valid
+    def test_message_invalid_parameter_syntax_twice(self):
+        with self.assertRaises(ICUError):
+            icu_format_message("en", "Hey {a b}!", arguments={"a": "you"})
+        with self.assertRaises(ICUError):
+            icu_format_message("en", "Hey {a b}!", arguments={"a": "you"})
+
+    # Tests that a cached message is formatted with each call's arguments
+    def test_same_message_different_arguments(self):
+        self.assertEqual(
+            icu_format_message("en", "Hey {a}!", arguments={"a": "you"}), "Hey you!"
+        )
+        self.assertEqual(
+            icu_format_message("en", "Hey {a}!", arguments={"a": "there"}),
+            "Hey there!",
+        )
+
+    # Tests that messages without arguments still get ICU quoting rules
+    def test_no_arguments_apostrophes(self):
+        self.assertEqual(icu_format_message("en", "Don't"), "Don't")
+        self.assertEqual(icu_format_message("en", "It''s"), "It's")
+        self.assertEqual(icu_format_message("en", "a '}' b"), "a } b")
+        self.assertEqual(icu_format_message("en", "a '{b}' c"), "a {b} c")
+
+    # Tests that arguments may be wrapped by the caller
+    def test_formattable_argument(self):
+        self.assertEqual(
+            icu_format_message(
+                "en", "Hey {a} {n}!", arguments={"a": Formattable("you"), "n": 2}
+            ),
+            "Hey you 2!",
+        )
+
     # Tests that a message can use a numeric variable
     def test_message_numeric_parameter(self):
         self.assertEqual(
@@ -216,6 +249,21 @@ class ICUFormatHtmlMessageTest(SimpleTestCase):
             '<a href="/you">Helloyouthere</a>',
         )
 
+    # Tests that the same message is restored differently for different tags
+    def test_same_message_different_tags(self):
+        self.assertEqual(
+            icu_format_html_message(
+                "en", "<a0>Hey</a0>", tags={"a0": {"tag": "a", "attrs": {"href": "/x"}}}
+            ),
+            '<a href="/x">Hey</a>',
+        )
+        self.assertEqual(
+            icu_format_html_message(
+                "en", "<a0>Hey</a0>", tags={"a0": {"tag": "a", "attrs": {"href": "/y"}}}
+            ),
+            '<a href="/y">Hey</a>',
+        )
+
     # Tests that arguments are substituted within tags
     def test_params_in_tags(self):
         self.assertEqual(
@@ -239,6 +287,51 @@ class ICUFormatHtmlMessageTest(SimpleTestCase):
             '<a href="/you">Hello &amp;&amp;</a>&gt;',
         )
 
+    # Tests that the contents of unknown and void tags are escaped exactly once
+    def test_escapes_unknown_tag_contents(self):
+        self.assertEqual(
+            icu_format_html_message("en", "<div>a & b<br></div><hr>c <b>></b>"),
+            "a &amp; bc &gt;",
+        )
+
+    # Tests that top-level comments are kept, and nested ones dropped
+    def test_keeps_top_level_comments(self):
+        self.assertEqual(
+            icu_format_html_message(
+                "en",
+                "<!-- note -->Hi<a0>you<!-- nested --></a0>",
+                tags={"a0": {"tag": "a", "attrs": {"href": "/you"}}},
+            ),
+            '<!-- note -->Hi<a href="/you">you</a>',
+        )
+
+    # Tests that a self-closing placeholder is restored as an empty tag
+    def test_self_closing_known_tag(self):
+        self.assertEqual(
+            icu_format_html_message("en", "Hi<b0/>you<i0/>", tags={"b0": {"tag": "b"}}),
+            "Hi<b></b>you",
+        )
+
+    # Tests that list-valued attributes are space-separated
+    def test_list_attribute(self):
+        self.assertEqual(
+            icu_format_html_message(
+                "en",
+                "<a0>Hi</a0>",
+                tags={"a0": {"tag": "a", "attrs": {"class": ["x", "y"]}}},
+            ),
+            '<a class="x y">Hi</a>',
+        )
+
+    # Tests that malformed tags only raise if the message uses them
+    def test_unused_malformed_tag(self):
+        tags = {"a0": {"tag": "a"}, "b0": {"attrs": {}}}
+        self.assertEqual(
+            icu_format_html_message("en", "<a0>Hi</a0>", tags=tags), "<a>Hi</a>"
+        )
+        with self.assertRaises(KeyError):
+            icu_format_html_message("en", "<b0>Hi</b0>", tags=tags)
+
     # Tests that message arguments are escaped
     def test_escapes_params(self):
         self.assertEqual(
@@ -353,6 +446,13 @@ class LocalizeTest(SimpleTestCase):
             with self.assertRaises(KeyError):
                 localize("el", "id")
 
+    def test_message_missing_in_given_locale_twice(self):
+        en_catalog = Catalog()
+        en_catalog.add("id", string="Hello")
+        with mock_app_catalogs({"el": Catalog(), "en": en_catalog}):
+            self.assertEqual(localize("el", "id"), "Hello")
+            self.assertEqual(localize("el", "id"), "Hello")
+
     # Tests that badly formatted parameter in a catalog can't break our system
     def test_message_invalid_parameter_syntax(self):
         en_catalog = Catalog()
@@ -1,11 +1,18 @@
 from typing import List, Tuple
 
-from django.db.models import Q
+from django.db.models import Case, IntegerField, Q, Value, When
 
 from .base import BaseCommand
 from .util import ChangesStepOutputs
 
 
+_STEP_IDS_BATCH_SIZE = 1000
+"""Maximum number of IDs in one `id IN (...)` query.
+
+Postgres plans poorly when given a huge `IN` list.
+"""
+
+
 def _update_selected_position(workflow, from_order, to_order):
     """Write `workflow.selected_tab_position` so it points to the same tab ID.
 
@@ -25,8 +32,17 @@ def _update_selected_position(workflow, from_order, to_order):
 def _write_order(workflow, tab_ids):
     """Write `tab.position` for all tabs so they are in the given order."""
     # We validated the IDs back in `.amend_create_args()`
-    for position, tab_id in enumerate(tab_ids):
-        workflow.tabs.filter(pk=tab_id).update(position=position)
+    #
+    # One UPDATE, not one per tab: SET position = CASE id WHEN ... END
+    workflow.tabs.filter(pk__in=tab_ids).update(
+        position=Case(
+            *(
+                When(pk=tab_id, then=Value(position))
+                for position, tab_id in enumerate(tab_ids)
+            ),
+            output_field=IntegerField(),
+        )
+    )
 
 
 class ReorderTabs(ChangesStepOutputs, BaseCommand):
@@ -77,46 +93,48 @@ class ReorderTabs(ChangesStepOutputs, BaseCommand):
         #
         # There's no need to re-render a Step that only depends on tabs
         # whose `position`s _haven't_ changed: its input tab order certainly
-        # hasn't changed.
-        first_change_index = None
-        last_change_index = None
-        for i, old_slug_and_new_slug in enumerate(zip(old_slugs, new_slugs)):
-            old_slug, new_slug = old_slug_and_new_slug
-            if old_slug != new_slug:
-                if first_change_index is None:
-                    first_change_index = i
-                last_change_index = i
-        moved_slugs = set(old_slugs[first_change_index : last_change_index + 1])
+        # hasn't changed. (If two tabs both keep their positions, their
+        # relative order is unchanged too.)
+        moved_slugs = set(
+            old_slug
+            for old_slug, new_slug in zip(old_slugs, new_slugs)
+            if old_slug != new_slug
+        )
+        if not moved_slugs:
+            return []  # no need to load the dependency graph
 
         # Figure out which params depend on those.
         from cjwstate.models.workflow import DependencyGraph
 
         graph = DependencyGraph.load_from_workflow(workflow)
         step_ids = graph.get_step_ids_depending_on_tab_slugs(moved_slugs)
-        q = Q(id__in=step_ids)
-        return self.q_to_step_delta_ids(q)
+        ret = []
+        for i in range(0, len(step_ids), _STEP_IDS_BATCH_SIZE):
+            q = Q(id__in=step_ids[i : i + _STEP_IDS_BATCH_SIZE])
+            ret.extend(self.q_to_step_delta_ids(q))
+        return ret
 
     def amend_create_kwargs(self, *, workflow, new_order):
+        # One query, ordered by position: derive everything else from it
         tab_slugs_and_ids = list(workflow.live_tabs.values_list("slug", "id"))
-        tab_ids_by_slug = dict((t[0], t[1]) for t in tab_slugs_and_ids)
-        tab_slugs_by_id = dict((t[1], t[0]) for t in tab_slugs_and_ids)
-
-        old_order = list(workflow.live_tabs.values_list("id", flat=True))
+        tab_ids_by_slug = dict(tab_slugs_and_ids)
+        old_slugs = [slug for slug, _ in tab_slugs_and_ids]
+        old_order = [id for _, id in tab_slugs_and_ids]
 
+        new_slugs = list(new_order)
         try:
-            new_order = [tab_ids_by_slug[slug] for slug in new_order]
+            new_order = [tab_ids_by_slug[slug] for slug in new_slugs]
         except KeyError:
             raise ValueError("wrong tab slugs")
-        # Need same number of elements, same elements. Don't compare sets
-        # because that doesn't test number of elements.
-        if sorted(new_order) != sorted(old_order):
+        # Need same number of elements, same elements. `old_order` has no
+        # duplicates, so equal sets plus equal lengths means `new_order` has
+        # none either.
+        if len(new_order) != len(old_order) or set(new_order) != set(old_order):
             raise ValueError("wrong tab slugs")
 
         if new_order == old_order:
             return None
 
-        old_slugs = [tab_slugs_by_id[id] for id in old_order]
-        new_slugs = [tab_slugs_by_id[id] for id in new_order]
         step_delta_ids = self.affected_step_delta_ids(workflow, old_slugs, new_slugs)
 
         return {
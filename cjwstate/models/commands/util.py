@@ -1,5 +1,5 @@
 from typing import List, Tuple
-from django.db.models import Q
+from django.db.models import Case, IntegerField, Q, Value, When
 from cjwstate.models.workflow import DependencyGraph
 
 
@@ -117,10 +117,20 @@ class ChangesStepOutputs:
 
         from ..step import Step
 
+        if prev_ids:
+            # One UPDATE, not one per step: SET ... = CASE id WHEN ... END
+            Step.objects.filter(pk__in=[step_id for step_id, _ in prev_ids]).update(
+                last_relevant_delta_id=Case(
+                    *(
+                        When(pk=step_id, then=Value(delta_id))
+                        for step_id, delta_id in prev_ids
+                    ),
+                    output_field=IntegerField(),
+                )
+            )
+
+        # If we have a step in memory, update it to stay synced with db
         for step_id, delta_id in prev_ids:
-            Step.objects.filter(id=step_id).update(last_relevant_delta_id=delta_id)
-
-            # If we have a step in memory, update it to stay synced with db
             if delta.step_id == step_id:  # delta.step_id may be None
                 delta.step.last_relevant_delta_id = delta_id
 
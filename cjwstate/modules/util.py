@@ -1,28 +1,30 @@
-from typing import Any, FrozenSet
+from typing import Any, FrozenSet, Set
 
 from cjwmodule.spec.paramschema import ParamSchema
 
 
-def gather_param_tab_slugs(schema: ParamSchema, value: Any) -> FrozenSet[str]:
-    """Find all tabs nested within `value`, recursively."""
+def add_param_tab_slugs(schema: ParamSchema, value: Any, slugs: Set[str]) -> None:
+    """Add all tabs nested within `value` to `slugs`, recursively.
+
+    This builds no intermediate sets, so it's cheap to call for many values.
+    """
     if isinstance(schema, ParamSchema.List):
-        return frozenset().union(
-            *(gather_param_tab_slugs(schema.inner_schema, v) for v in value)
-        )
+        for v in value:
+            add_param_tab_slugs(schema.inner_schema, v, slugs)
     elif isinstance(schema, ParamSchema.Dict):
-        return frozenset().union(
-            *(
-                gather_param_tab_slugs(inner_schema, value[name])
-                for name, inner_schema in schema.properties.items()
-            )
-        )
+        for name, inner_schema in schema.properties.items():
+            add_param_tab_slugs(inner_schema, value[name], slugs)
     elif isinstance(schema, ParamSchema.Map):
-        return frozenset().union(
-            *(gather_param_tab_slugs(schema.value_schema, v) for v in value.values())
-        )
+        for v in value.values():
+            add_param_tab_slugs(schema.value_schema, v, slugs)
     elif isinstance(schema, ParamSchema.Tab) and value:
-        return frozenset([value])
+        slugs.add(value)
     elif isinstance(schema, ParamSchema.Multitab):
-        return frozenset(value)
-    else:
-        return frozenset()
+        slugs.update(value)
+
+
+def gather_param_tab_slugs(schema: ParamSchema, value: Any) -> FrozenSet[str]:
+    """Find all tabs nested within `value`, recursively."""
+    slugs = set()
+    add_param_tab_slugs(schema, value, slugs)
+    return frozenset(slugs)
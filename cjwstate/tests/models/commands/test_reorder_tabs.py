@@ -103,6 +103,38 @@ class ReorderTabsTest(DbTestCaseWithModuleRegistryAndMockKernel):
         step.refresh_from_db()
         self.assertEqual(step.last_relevant_delta_id, cmd.id)
 
+    @patch.object(rabbitmq, "send_update_to_workflow_clients", async_noop)
+    @patch.object(rabbitmq, "queue_render", async_noop)
+    def test_ignore_steps_depending_on_unmoved_tabs(self):
+        # tab slug: tab-1
+        workflow = Workflow.create_and_init(selected_tab_position=2)
+        workflow.tabs.create(position=1, slug="tab-2")
+        workflow.tabs.create(position=2, slug="tab-3")
+
+        # Create `step` depending on tab 2, which will keep its position
+        module_zipfile = create_module_zipfile(
+            "x", spec_kwargs={"parameters": [{"id_name": "tabs", "type": "multitab"}]}
+        )
+        step = workflow.tabs.first().steps.create(
+            order=0,
+            slug="step-1",
+            module_id_name="x",
+            params={"tabs": ["tab-2"]},
+            last_relevant_delta_id=workflow.last_delta_id,
+            cached_migrated_params={"tabs": ["tab-2"]},
+            cached_migrated_params_module_version=module_zipfile.version,
+        )
+
+        self.run_with_async_db(
+            commands.do(
+                ReorderTabs,
+                workflow_id=workflow.id,
+                new_order=["tab-3", "tab-2", "tab-1"],
+            )
+        )
+        step.refresh_from_db()
+        self.assertEqual(step.last_relevant_delta_id, workflow.last_delta_id)
+
     @patch.object(rabbitmq, "send_update_to_workflow_clients")
     @patch.object(rabbitmq, "queue_render", async_noop)
     def test_clientside_update(self, send_delta):
@@ -1,7 +1,8 @@
+import contextlib
 import io
 import logging
 from dataclasses import dataclass
-from itertools import cycle
+from functools import cached_property
 from pathlib import Path
 from typing import Any, Dict, List, Optional, FrozenSet
 
@@ -11,7 +12,7 @@ from cjwkernel.chroot import ChrootContext
 from cjworkbench.sync import database_sync_to_async
 from cjwstate.models import Step, Workflow
 from cjwstate.modules.types import ModuleZipfile
-from cjwstate.modules.util import gather_param_tab_slugs
+from cjwstate.modules.util import add_param_tab_slugs
 from cjwstate.rendercache import load_cached_render_result, CorruptCacheError
 from .step import execute_step, locked_step
 from .types import StepResult, Tab
@@ -30,23 +31,6 @@ def _init_empty_table_bytes() -> bytes:
 EmptyTableBytes: bytes = _init_empty_table_bytes()
 
 
-class cached_property:
-    """Memoize a property by replacing the function with the retval."""
-
-    def __init__(self, func):
-        self.__doc__ = getattr(func, "__doc__")
-        self._func = func
-
-    def __get__(self, obj, cls):
-        if obj is None:
-            return self
-
-        func = self._func
-        value = func(obj)
-        obj.__dict__[func.__name__] = value
-        return value
-
-
 @dataclass(frozen=True)
 class ExecuteStep:
     step: Step
@@ -76,12 +60,16 @@ class TabFlow:
 
         `None` if the entire flow is fresh.
         """
-        cached_results = [step.step.cached_render_result for step in self.steps]
-        try:
-            # Stale Step means its .cached_render_result is None.
-            return cached_results.index(None)
-        except ValueError:
-            return None
+        # Stale Step means its .cached_render_result is None. Stop at the
+        # first one: there's no need to build the others' results.
+        return next(
+            (
+                index
+                for index, step in enumerate(self.steps)
+                if step.step.cached_render_result is None
+            ),
+            None,
+        )
 
     @cached_property
     def stale_steps(self) -> List[ExecuteStep]:
@@ -109,15 +97,13 @@ class TabFlow:
     @cached_property
     def input_tab_slugs(self) -> FrozenSet[str]:
         """Slugs of tabs that are used as _input_ into this tab's steps."""
-        return frozenset().union(
-            *(
-                gather_param_tab_slugs(
-                    step.module_zipfile.get_spec().param_schema, step.params
+        ret = set()
+        for step in self.steps:
+            if step.module_zipfile:
+                add_param_tab_slugs(
+                    step.module_zipfile.get_spec().param_schema, step.params, ret
                 )
-                for step in self.steps
-                if step.module_zipfile
-            )
-        )
+        return frozenset(ret)
 
 
 @database_sync_to_async
@@ -167,9 +153,12 @@ async def execute_tab_flow(
     # We pass data between two Arrow files, kinda like double-buffering. The
     # two are `output_path` and `buffer_path`. This requires fewer temporary
     # files, so it's less of a hassle to clean up.
-    with chroot_context.tempfile_context(
-        dir=basedir, prefix="render-buffer", suffix=".arrow"
-    ) as buffer_path:
+    #
+    # We only create `buffer_path` when we need it. When the whole tab is
+    # fresh, we load the last step's output straight into `output_path`.
+    with contextlib.ExitStack() as exit_stack:
+        buffer_path: Optional[Path] = None
+
         # We will render from `buffer_path` to `output_path` and from
         # `output_path` to `buffer_path`, alternating, so that the final output
         # is in `output_path` and we only use a single tempfile. (Think "page
@@ -177,7 +166,21 @@ async def execute_tab_flow(
         #
         # [cache] -> A -> B -> C: A and C use `output_path`.
         # [cache] -> A -> B: cache and B use `output_path`.
-        step_output_paths = cycle([output_path, buffer_path])
+        def step_output_path(step_index: int) -> Path:
+            """Path holding the output of `flow.steps[step_index]`.
+
+            `step_index == -1` means "the input into `flow.steps[0]`".
+            """
+            nonlocal buffer_path
+            if (len(flow.steps) - step_index) % 2 == 1:
+                return output_path
+            if buffer_path is None:
+                buffer_path = exit_stack.enter_context(
+                    chroot_context.tempfile_context(
+                        dir=basedir, prefix="render-buffer", suffix=".arrow"
+                    )
+                )
+            return buffer_path
 
         # Find the first stale step, going backwards. Build a to-do list (in
         # reverse).
@@ -198,7 +201,7 @@ async def execute_tab_flow(
         # (the input to `flow.steps[step_index]`)
         known_stale = flow.first_stale_index
         for step_index in range(len(flow.steps) - 1, -1, -1):
-            input_path = next(step_output_paths)
+            input_path = step_output_path(step_index)
             if known_stale is not None and step_index >= known_stale:
                 # We know this step needs to be rendered, from our
                 # last_relevant_delta_id math.
@@ -225,16 +228,14 @@ async def execute_tab_flow(
                     # loop
         else:
             # "Step minus-1" -- we need an input into flow.steps[0]
-            #
-            # fiddle with cycle's state -- `last_result` has no backing file;
-            # but if it did, it would be `next(step_output_paths)`.
-            input_path = next(step_output_paths)
+            input_path = step_output_path(-1)
             input_path.write_bytes(EmptyTableBytes)
             last_result = StepResult(path=input_path, columns=[])
             step_index = 0  # needed when there are no steps at all
 
-        for step, output_path in zip(flow.steps[step_index:], step_output_paths):
-            output_path.write_bytes(b"")  # don't leak data from two steps ago
+        for step_index, step in enumerate(flow.steps[step_index:], step_index):
+            step_path = step_output_path(step_index)
+            step_path.write_bytes(b"")  # don't leak data from two steps ago
             output: StepResult = await execute_step(
                 chroot_context=chroot_context,
                 workflow=workflow,
@@ -245,7 +246,7 @@ async def execute_tab_flow(
                 input_path=last_result.path,
                 input_table_columns=last_result.columns,
                 tab_results=tab_results,
-                output_path=output_path,
+                output_path=step_path,
             )
             last_result = output
 
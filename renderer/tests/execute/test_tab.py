@@ -1,12 +1,13 @@
 import contextlib
 import logging
+import os
 import shutil
 from unittest.mock import patch
 
 import pyarrow as pa
 from cjwmodule.arrow.testing import assert_arrow_table_equals, make_column, make_table
 
-from cjwkernel.chroot import EDITABLE_CHROOT
+from cjwkernel.chroot import EDITABLE_CHROOT, ChrootContext
 from cjwkernel.kernel import Kernel
 from cjwkernel.tests.util import arrow_table_context
 from cjwkernel.types import Column, ColumnType, RenderResult
@@ -45,21 +46,30 @@ def mock_render(arrow_table: pa.Table):
     return inner
 
 
+def spy_tempfile_context():
+    """Record calls to `ChrootContext.tempfile_context()` (and still run it)."""
+    return patch.object(
+        ChrootContext,
+        "tempfile_context",
+        autospec=True,
+        side_effect=ChrootContext.tempfile_context,
+    )
+
+
 class TabTests(DbTestCaseWithModuleRegistry):
     @contextlib.contextmanager
     def _execute(self, workflow, flow, tab_columns, expect_log_level=logging.DEBUG):
         with EDITABLE_CHROOT.acquire_context() as chroot_context:
             with chroot_context.tempdir_context(prefix="test_tab") as tempdir:
-                with chroot_context.tempfile_context(
-                    prefix="execute-tab-output", suffix=".arrow", dir=tempdir
-                ) as out_path:
-                    with self.assertLogs("renderer.execute", level=expect_log_level):
-                        result = self.run_with_async_db(
-                            execute_tab_flow(
-                                chroot_context, workflow, flow, tab_columns, out_path
-                            )
+                # Like renderer.execute.workflow, pass a path that doesn't exist
+                out_path = tempdir / "execute-tab-output.arrow"
+                with self.assertLogs("renderer.execute", level=expect_log_level):
+                    result = self.run_with_async_db(
+                        execute_tab_flow(
+                            chroot_context, workflow, flow, tab_columns, out_path
                         )
-                        yield result, out_path
+                    )
+                    yield result, out_path
 
     def test_execute_empty_tab(self):
         workflow = Workflow.create_and_init()
@@ -146,6 +156,38 @@ class TabTests(DbTestCaseWithModuleRegistry):
                 r"execute-tab-output.*\.arrow",
             )
 
+    @patch.object(rabbitmq, "send_update_to_workflow_clients", fake_send)
+    def test_execute_cache_miss_single_step(self):
+        # The only step renders straight into the (not-yet-existing) output
+        module_zipfile = create_module_zipfile("mod", spec_kwargs={"loads_data": True})
+        workflow = Workflow.create_and_init()
+        tab = workflow.tabs.first()
+        step1 = tab.steps.create(
+            order=0,
+            slug="step-1",
+            module_id_name="mod",
+            last_relevant_delta_id=workflow.last_delta_id,
+        )
+
+        tab_flow = TabFlow(
+            Tab(tab.slug, tab.name), [ExecuteStep(step1, module_zipfile, {})]
+        )
+
+        table = make_table(make_column("A", ["a"]))
+
+        with patch.object(Kernel, "render", side_effect=mock_render(table)):
+            with self._execute(workflow, tab_flow, {}) as (result, path):
+                self.assertEqual(
+                    result, StepResult(path, [Column("A", ColumnType.Text())])
+                )
+                assert_arrow_table_equals(load_trusted_arrow_file(path), table)
+
+            Kernel.render.assert_called_once()
+            self.assertEqual(
+                Kernel.render.call_args[1]["output_filename"],
+                "execute-tab-output.arrow",
+            )
+
     @patch.object(rabbitmq, "send_update_to_workflow_clients", fake_send)
     def test_execute_partial_cache_hit(self):
         module_zipfile = create_module_zipfile("mod", spec_kwargs={"loads_data": True})
@@ -253,3 +295,132 @@ class TabTests(DbTestCaseWithModuleRegistry):
                 Kernel.render.call_args[1]["output_filename"],
                 r"execute-tab-output.*\.arrow",
             )
+
+    @patch.object(rabbitmq, "send_update_to_workflow_clients", fake_send)
+    def test_buffer_not_created_when_all_steps_are_fresh(self):
+        module_zipfile = create_module_zipfile("mod", spec_kwargs={"loads_data": True})
+        workflow = Workflow.create_and_init()
+        tab = workflow.tabs.first()
+        step1 = tab.steps.create(
+            order=0, slug="step-1", last_relevant_delta_id=workflow.last_delta_id
+        )
+        write_to_rendercache(
+            workflow, step1, workflow.last_delta_id, make_table(make_column("A", [1]))
+        )
+        step2 = tab.steps.create(
+            order=1, slug="step-2", last_relevant_delta_id=workflow.last_delta_id
+        )
+        write_to_rendercache(
+            workflow, step2, workflow.last_delta_id, make_table(make_column("B", [2]))
+        )
+
+        tab_flow = TabFlow(
+            Tab(tab.slug, tab.name),
+            [
+                ExecuteStep(step1, module_zipfile, {}),
+                ExecuteStep(step2, module_zipfile, {}),
+            ],
+        )
+
+        with spy_tempfile_context() as tempfile_context:
+            with self._execute(workflow, tab_flow, {}) as (result, path):
+                self.assertEqual(os.listdir(path.parent), [path.name])
+            tempfile_context.assert_not_called()
+
+    @patch.object(rabbitmq, "send_update_to_workflow_clients", fake_send)
+    def test_buffer_holds_input_when_last_step_is_stale(self):
+        module_zipfile = create_module_zipfile("mod", spec_kwargs={"loads_data": True})
+        workflow = Workflow.create_and_init()
+        tab = workflow.tabs.first()
+        step1 = tab.steps.create(
+            order=0,
+            slug="step-1",
+            module_id_name="mod",
+            last_relevant_delta_id=workflow.last_delta_id,
+        )
+        write_to_rendercache(
+            workflow, step1, workflow.last_delta_id, make_table(make_column("A", ["a"]))
+        )
+        step2 = tab.steps.create(
+            order=1,
+            slug="step-2",
+            module_id_name="mod",
+            last_relevant_delta_id=workflow.last_delta_id,
+        )
+
+        tab_flow = TabFlow(
+            Tab(tab.slug, tab.name),
+            [
+                ExecuteStep(step1, module_zipfile, {}),
+                ExecuteStep(step2, module_zipfile, {}),
+            ],
+        )
+
+        new_table = make_table(make_column("B", ["b"]))
+
+        with spy_tempfile_context() as tempfile_context, patch.object(
+            Kernel, "render", side_effect=mock_render(new_table)
+        ):
+            with self._execute(workflow, tab_flow, {}) as (result, path):
+                assert_arrow_table_equals(load_trusted_arrow_file(path), new_table)
+                # the buffer is deleted once the tab is rendered
+                self.assertEqual(os.listdir(path.parent), [path.name])
+
+            tempfile_context.assert_called_once()
+            # step1's cached output was loaded into the buffer
+            Kernel.render.assert_called_once()
+            self.assertRegex(
+                Kernel.render.call_args[1]["input_filename"], r"^render-buffer.*"
+            )
+            self.assertEqual(Kernel.render.call_args[1]["output_filename"], path.name)
+
+    @patch.object(rabbitmq, "send_update_to_workflow_clients", fake_send)
+    def test_buffer_alternates_after_backtracking_on_corrupt_cache_error(self):
+        module_zipfile = create_module_zipfile("mod", spec_kwargs={"loads_data": True})
+        workflow = Workflow.create_and_init()
+        tab = workflow.tabs.first()
+        # step1: cached result is fresh -- but CORRUPT
+        step1 = tab.steps.create(
+            order=0,
+            slug="step-1",
+            module_id_name="mod",
+            last_relevant_delta_id=workflow.last_delta_id,
+        )
+        write_to_rendercache(
+            workflow, step1, workflow.last_delta_id, make_table(make_column("A", [1]))
+        )
+        step1.refresh_from_db()
+        s3.put_bytes(
+            rendercache.io.BUCKET,
+            rendercache.io.crr_parquet_key(step1.cached_render_result),
+            b"CORRUPT",
+        )
+        # step2: no cached result -- must re-render
+        step2 = tab.steps.create(order=1, slug="step-2", module_id_name="mod")
+
+        tab_flow = TabFlow(
+            Tab(tab.slug, tab.name),
+            [
+                ExecuteStep(step1, module_zipfile, {}),
+                ExecuteStep(step2, module_zipfile, {}),
+            ],
+        )
+
+        new_table = make_table(make_column("B", ["b"]))
+
+        with spy_tempfile_context() as tempfile_context, patch.object(
+            Kernel, "render", side_effect=mock_render(new_table)
+        ):
+            with self._execute(
+                workflow, tab_flow, {}, expect_log_level=logging.ERROR
+            ) as (result, path):
+                assert_arrow_table_equals(load_trusted_arrow_file(path), new_table)
+                self.assertEqual(os.listdir(path.parent), [path.name])
+
+            tempfile_context.assert_called_once()
+            # [empty] -> output; step1: output -> buffer; step2: buffer -> output
+            call1, call2 = Kernel.render.call_args_list
+            self.assertEqual(call1[1]["input_filename"], path.name)
+            self.assertRegex(call1[1]["output_filename"], r"^render-buffer.*")
+            self.assertEqual(call2[1]["input_filename"], call1[1]["output_filename"])
+            self.assertEqual(call2[1]["output_filename"], path.name)
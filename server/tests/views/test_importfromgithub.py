@@ -0,0 +1,85 @@
+import threading
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+
+from cjwstate import clientside
+from cjwstate.importmodule import WorkbenchModuleImportError
+from cjwstate.tests.utils import (
+    DbTestCaseWithModuleRegistry,
+    create_module_zipfile,
+    create_test_user,
+)
+from server.views.importfromgithub import _import_executor
+
+
+class ImportFromGithubTest(DbTestCaseWithModuleRegistry):
+    def setUp(self):
+        super().setUp()
+
+        self.user = create_test_user()
+        self.user.is_staff = True
+        self.user.save(update_fields=["is_staff"])
+        self.async_client.force_login(self.user)
+
+    def _post(self, data):
+        # Go through Django's ASGI handler, as in production
+        return async_to_sync(self.async_client.post)(
+            "/api/importfromgithub", data, content_type="application/json"
+        )
+
+    def test_import(self):
+        module_zipfile = create_module_zipfile("mod")
+        thread_names = []
+
+        def fake_import(url):
+            thread_names.append(threading.current_thread().name)
+            return clientside.Module(module_zipfile.get_spec(), ""), module_zipfile
+
+        with patch("server.views.importfromgithub.import_module_from_url", fake_import):
+            response = self._post({"url": "https://github.com/CJWorkbench/mod"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["id_name"], "mod")
+        # Not on database_sync_to_async's threadpool, which websockets share
+        self.assertRegex(thread_names[0], r"^import-from-github-")
+
+    def test_import_error(self):
+        with patch(
+            "server.views.importfromgithub.import_module_from_url",
+            side_effect=WorkbenchModuleImportError("bad module"),
+        ):
+            response = self._post({"url": "https://github.com/CJWorkbench/mod"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"error": "bad module"})
+
+    def test_not_staff(self):
+        self.user.is_staff = False
+        self.user.save(update_fields=["is_staff"])
+        response = self._post({"url": "https://github.com/CJWorkbench/mod"})
+        self.assertEqual(response.status_code, 403)
+
+    def test_missing_url(self):
+        response = self._post({})
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_not_allowed(self):
+        response = async_to_sync(self.async_client.get)("/api/importfromgithub")
+        self.assertEqual(response.status_code, 405)
+
+    def test_not_logged_in(self):
+        self.async_client.logout()
+        response = self._post({"url": "https://github.com/CJWorkbench/mod"})
+        self.assertEqual(response.status_code, 302)
+
+    def test_reject_without_waiting_for_running_import(self):
+        # Occupy the import thread, as a slow import would
+        release = threading.Event()
+        import_timed_out = _import_executor.submit(lambda: not release.wait(10))
+        try:
+            self.user.is_staff = False
+            self.user.save(update_fields=["is_staff"])
+            response = self._post({"url": "https://github.com/CJWorkbench/mod"})
+            self.assertEqual(response.status_code, 403)
+        finally:
+            release.set()
+        self.assertFalse(import_timed_out.result())
@@ -1,31 +1,42 @@
+import asyncio
+import contextvars
 import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
 
-from django.http import JsonResponse
-from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
+from django.contrib.auth.views import redirect_to_login
+from django.db import close_old_connections, connection
+from django.http import HttpRequest, HttpResponse, HttpResponseNotAllowed, JsonResponse
 
+from cjworkbench.sync import database_sync_to_async
 from cjwstate.importmodule import WorkbenchModuleImportError, import_module_from_url
 from cjwstate.models.module_registry import MODULE_REGISTRY
 from server.serializers import JsonizeContext, jsonize_clientside_module
 
 
-@require_POST
-@login_required
-def import_from_github(request):
-    if not request.user.is_staff:
-        return JsonResponse({"error": "Only an admin can call this method"}, status=403)
+_import_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="import-from-github-"
+)
+"""Thread that runs module imports, one at a time.
 
-    try:
-        url = str(json.loads(request.body)["url"])
-    except (ValueError, KeyError, TypeError):
-        return JsonResponse(
-            {"error": "You must pass a 'url' to a Git repository"}, status=400
-        )
+Imports take many seconds. Running them on `database_sync_to_async`'s
+small, shared threadpool would starve every websocket's database calls.
+Imports are rare and staff-only, so one thread is plenty.
+"""
+
+
+@database_sync_to_async
+def _load_user_is_authenticated_and_staff(request: HttpRequest) -> Tuple[bool, bool]:
+    user = request.user  # lazy: reading it queries the database
+    return user.is_authenticated, user.is_staff
 
+
+def _import_from_url_in_thread(url: str, locale_id: str) -> HttpResponse:
+    close_old_connections()
     try:
         clientside_module, module_zipfile = import_module_from_url(url)
         ctx = JsonizeContext(
-            locale_id=request.locale_id,
+            locale_id=locale_id,
             module_zipfiles={module_zipfile.module_id: module_zipfile},
         )
         data = jsonize_clientside_module(clientside_module, ctx)
@@ -34,3 +45,42 @@ def import_from_github(request):
         # Respond with 200 OK so the client side can read the error message.
         # TODO make the client smarter
         return JsonResponse({"error": str(err)}, status=200)
+    finally:
+        # Imports are rare: don't hold a database connection open between them
+        connection.close()
+
+
+async def import_from_github(request: HttpRequest) -> HttpResponse:
+    """Import a module from a URL, without blocking other requests.
+
+    Importing downloads and validates a whole module, which can take many
+    seconds. Django runs sync views one at a time on a single thread, so a
+    sync view would stall every other sync view for the duration. Instead,
+    validate the request here and queue only the import on
+    `_import_executor`.
+    """
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    is_authenticated, is_staff = await _load_user_is_authenticated_and_staff(request)
+    if not is_authenticated:
+        return redirect_to_login(request.get_full_path())
+    if not is_staff:
+        return JsonResponse({"error": "Only an admin can call this method"}, status=403)
+
+    try:
+        url = str(json.loads(request.body)["url"])
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse(
+            {"error": "You must pass a 'url' to a Git repository"}, status=400
+        )
+
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _import_executor,
+        context.run,
+        _import_from_url_in_thread,
+        url,
+        request.locale_id,
+    )